@@ -4,8 +4,10 @@ from jobtech_client import JobTechClient
 from typing import Optional, Dict, Any, List
 import logging
 from sqlalchemy.orm import Session
-from database import init_db, get_db, Job
-from datetime import datetime
+from database import init_db, get_db, Job, upsert_jobs
+from job_scheduler import create_work_queue, trigger_refresh
+import base64
+import os
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
@@ -28,6 +30,24 @@ client = JobTechClient()
 # Initialize database
 init_db()
 
+# Embedded scheduler; set EMBEDDED_SCHEDULER=false when running `job_scheduler.py worker` instead
+EMBEDDED_SCHEDULER = os.getenv("EMBEDDED_SCHEDULER", "true").lower() == "true"
+work_queue = create_work_queue(client=client)
+
+def job_to_dict(job: Job) -> Dict[str, Any]:
+    """Column values of a Job row (``__dict__`` also carries SQLAlchemy state that cannot be serialized)"""
+    return {column.name: getattr(job, column.name) for column in Job.__table__.columns}
+
+@app.on_event("startup")
+async def start_work_queue():
+    if EMBEDDED_SCHEDULER:
+        await work_queue.start()
+
+@app.on_event("shutdown")
+async def stop_work_queue():
+    if work_queue.running:
+        await work_queue.stop()
+
 @app.get("/search")
 async def search_jobs(
     query: Optional[str] = Query(None, description="Search query"),
@@ -66,43 +86,14 @@ async def search_jobs(
         
         # Store jobs in database
         if "hits" in result:
-            for hit in result["hits"]:
-                # Check if job already exists
-                existing_job = db.query(Job).filter(Job.job_id == hit["id"]).first()
-                if existing_job:
-                    # Update existing job
-                    for key, value in hit.items():
-                        if hasattr(existing_job, key):
-                            setattr(existing_job, key, value)
-                    existing_job.updated_at = datetime.utcnow()
-                else:
-                    # Create new job
-                    job_data = {
-                        "job_id": hit["id"],
-                        "external_id": hit.get("external_id"),
-                        "original_id": hit.get("original_id"),
-                        "headline": hit.get("headline", ""),
-                        "description": hit.get("description", {}).get("text", ""),
-                        "webpage_url": hit.get("webpage_url", ""),
-                        "logo_url": hit.get("logo_url"),
-                        "application_deadline": datetime.fromisoformat(hit["application_deadline"]) if hit.get("application_deadline") else None,
-                        "number_of_vacancies": hit.get("number_of_vacancies", 1),
-                        "employer": hit.get("employer", {}),
-                        "workplace_address": hit.get("workplace_address", {}),
-                        "must_have": hit.get("must_have", {}),
-                        "nice_to_have": hit.get("nice_to_have", {}),
-                        "employment_type": hit.get("employment_type", {}).get("label", ""),
-                        "salary_type": hit.get("salary_type", {}).get("label", ""),
-                        "salary_description": hit.get("salary_description", ""),
-                        "duration": hit.get("duration", {}).get("label", ""),
-                        "working_hours_type": hit.get("working_hours_type", {}).get("label", ""),
-                        "scope_of_work": hit.get("scope_of_work", 100)
-                    }
-                    new_job = Job(**job_data)
-                    db.add(new_job)
+            new_count, _ = upsert_jobs(db, result["hits"])
             
             # Commit changes to database
             db.commit()
+
+            # New ads for this query: pull a fuller page in the background
+            if new_count and query:
+                await trigger_refresh(work_queue, query, client=client)
         
         return result
     except Exception as e:
@@ -118,7 +109,7 @@ async def get_jobs(
     """Get jobs from local database"""
     try:
         jobs = db.query(Job).offset(skip).limit(limit).all()
-        return [job.__dict__ for job in jobs]
+        return [job_to_dict(job) for job in jobs]
     except Exception as e:
         logger.error(f"Error in get_jobs: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -131,32 +122,11 @@ async def get_job(job_id: str, db: Session = Depends(get_db)) -> Dict[str, Any]:
         if not job:
             # If not found in local DB, fetch from JobTech API
             result = client.get_job_ad(job_id)
-            # Store in database
-            job_data = {
-                "job_id": result["id"],
-                "external_id": result.get("external_id"),
-                "original_id": result.get("original_id"),
-                "headline": result.get("headline", ""),
-                "description": result.get("description", {}).get("text", ""),
-                "webpage_url": result.get("webpage_url", ""),
-                "logo_url": result.get("logo_url"),
-                "application_deadline": datetime.fromisoformat(result["application_deadline"]) if result.get("application_deadline") else None,
-                "number_of_vacancies": result.get("number_of_vacancies", 1),
-                "employer": result.get("employer", {}),
-                "workplace_address": result.get("workplace_address", {}),
-                "must_have": result.get("must_have", {}),
-                "nice_to_have": result.get("nice_to_have", {}),
-                "employment_type": result.get("employment_type", {}).get("label", ""),
-                "salary_type": result.get("salary_type", {}).get("label", ""),
-                "salary_description": result.get("salary_description", ""),
-                "duration": result.get("duration", {}).get("label", ""),
-                "working_hours_type": result.get("working_hours_type", {}).get("label", ""),
-                "scope_of_work": result.get("scope_of_work", 100)
-            }
-            job = Job(**job_data)
-            db.add(job)
+            # Store in database; a concurrent request may be storing the same ad
+            upsert_jobs(db, [result])
             db.commit()
-        return job.__dict__
+            job = db.query(Job).filter(Job.job_id == result["id"]).first()
+        return job_to_dict(job)
     except Exception as e:
         logger.error(f"Error in get_job: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -167,7 +137,8 @@ async def get_job_logo(job_id: str):
     try:
         logger.info(f"Get logo request - job_id: {job_id}")
         logo_data = client.get_job_logo(job_id)
-        return {"logo": logo_data}
+        # Image bytes are not valid JSON text, so send them base64-encoded
+        return {"logo": base64.b64encode(logo_data).decode("ascii")}
     except Exception as e:
         logger.error(f"Error in get_job_logo: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -191,6 +162,28 @@ async def get_suggestions(
         logger.error(f"Error in get_suggestions: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/refresh")
+async def refresh_jobs(
+    query: str = Query(..., description="Search query to refresh")
+) -> Dict[str, Any]:
+    """Queue a background refresh of a search query"""
+    if not work_queue.running:
+        raise HTTPException(status_code=503, detail="Scheduler is not running in this process")
+    status = await trigger_refresh(work_queue, query, client=client)
+    return {"query": query, "status": status}
+
+@app.get("/scheduler/runs")
+async def get_scheduler_runs(
+    name: Optional[str] = Query(None, description="Filter by job name"),
+    limit: int = Query(50, description="Maximum number of runs")
+) -> List[Dict[str, Any]]:
+    """Get recent scheduler run history with timings"""
+    try:
+        return work_queue.run_history(name=name, limit=limit)
+    except Exception as e:
+        logger.error(f"Error in get_scheduler_runs: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=5001) 
\ No newline at end of file
@@ -0,0 +1,213 @@
+import argparse
+import json
+import logging
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Smallest valid PNG (1x1 transparent pixel)
+LOGO_PNG = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000100e221bc330000000049454e44ae426082"
+)
+
+HEADLINES = ["Data Engineer", "Backend Developer", "Systemutvecklare", "Sjuksköterska",
+             "Lagerarbetare", "Projektledare", "Data Scientist", "Frontend Developer"]
+MUNICIPALITIES = ["Stockholm", "Göteborg", "Malmö", "Uppsala", "Linköping", "Umeå"]
+EMPLOYMENT_TYPES = ["Vanlig anställning", "Sommarjobb / feriejobb", "Behovsanställning"]
+
+def synthetic_ad(index: int) -> Dict[str, Any]:
+    """Build a deterministic ad shaped like a JobTech search hit"""
+    headline = HEADLINES[index % len(HEADLINES)]
+    municipality = MUNICIPALITIES[index % len(MUNICIPALITIES)]
+    deadline = datetime(2026, 1, 1) + timedelta(days=index % 90)
+    return {
+        "id": f"FAKE{index:08d}",
+        "external_id": f"EXT-{index}",
+        "original_id": None,
+        "headline": f"{headline} #{index}",
+        "description": {
+            "text": f"{headline} sökes till vårt team i {municipality}. " * 20,
+            "text_formatted": None
+        },
+        "webpage_url": f"https://arbetsformedlingen.se/platsbanken/annonser/{index}",
+        "logo_url": f"https://www.arbetsformedlingen.se/rest/arbetsgivare/rest/af/v3/organisation/{index}/logotyper/logo.png",
+        "application_deadline": deadline.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "number_of_vacancies": 1 + index % 3,
+        "employer": {"name": f"Employer {index % 500}", "organization_number": f"55{index:08d}"},
+        "workplace_address": {"municipality": municipality, "region": "Sverige", "country": "Sverige"},
+        "must_have": {"skills": [{"label": "Python"}], "languages": [], "work_experiences": []},
+        "nice_to_have": {"skills": [{"label": "SQL"}], "languages": [], "work_experiences": []},
+        "employment_type": {"label": EMPLOYMENT_TYPES[index % len(EMPLOYMENT_TYPES)]},
+        "salary_type": {"label": "Fast månads- vecko- eller timlön"},
+        "salary_description": "Enligt överenskommelse",
+        "duration": {"label": "Tills vidare"},
+        "working_hours_type": {"label": "Heltid"},
+        "scope_of_work": {"min": 100, "max": 100}
+    }
+
+class FakeJobTechServer:
+    """
+    Local stand-in for the JobTech search API.
+
+    Serves ``/search``, ``/ad/{id}``, ``/ad/{id}/logo`` and ``/complete`` from
+    either recorded hits (a JSON list or a ``/search`` response) or
+    ``ad_count`` synthetic ads. Every request is delayed by ``latency_ms``
+    plus up to ``jitter_ms`` and fails with a 503 at ``error_rate``.
+    """
+
+    def __init__(self,
+                 host: str = "127.0.0.1",
+                 port: int = 0,
+                 ad_count: int = 10000,
+                 latency_ms: float = 0.0,
+                 jitter_ms: float = 0.0,
+                 error_rate: float = 0.0,
+                 fixture_path: Optional[str] = None,
+                 seed: int = 42):
+        self.ad_count = ad_count
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.recorded: Optional[List[Dict[str, Any]]] = None
+        if fixture_path:
+            with open(fixture_path) as f:
+                data = json.load(f)
+            self.recorded = data.get("hits", []) if isinstance(data, dict) else data
+            self.ad_count = len(self.recorded)
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeJobTechServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"Fake JobTech server listening on {self.base_url} with {self.ad_count} ads")
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeJobTechServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def get_ad(self, index: int) -> Dict[str, Any]:
+        if self.recorded is not None:
+            return self.recorded[index]
+        return synthetic_ad(index)
+
+    def find_ad(self, ad_id: str) -> Optional[Dict[str, Any]]:
+        if self.recorded is not None:
+            return next((ad for ad in self.recorded if str(ad.get("id")) == ad_id), None)
+        if ad_id.startswith("FAKE") and ad_id[4:].isdigit() and int(ad_id[4:]) < self.ad_count:
+            return synthetic_ad(int(ad_id[4:]))
+        return None
+
+    def search(self, offset: int, limit: int) -> Dict[str, Any]:
+        end = min(offset + limit, self.ad_count)
+        return {
+            "total": {"value": self.ad_count},
+            "positions": self.ad_count,
+            "query_time_in_millis": 1,
+            "result_time_in_millis": 1,
+            "hits": [self.get_ad(i) for i in range(offset, end)]
+        }
+
+    def complete(self, query: str, limit: int) -> Dict[str, Any]:
+        words = sorted({headline.lower() for headline in HEADLINES if headline.lower().startswith(query.lower())})
+        return {
+            "typeahead": [
+                {"value": word, "found_phrase": word, "type": "occupation", "occurrences": 100}
+                for word in words[:limit]
+            ]
+        }
+
+    def _delay_and_fail(self) -> bool:
+        """Sleep for the configured latency; return True if this request should fail"""
+        with self._random_lock:
+            jitter = self._random.uniform(0, self.jitter_ms) if self.jitter_ms else 0.0
+            fail = self._random.random() < self.error_rate
+        if self.latency_ms or jitter:
+            time.sleep((self.latency_ms + jitter) / 1000)
+        return fail
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if server._delay_and_fail():
+                    return self._send_json(503, {"message": "Injected error"})
+
+                url = urlparse(self.path)
+                params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                parts = [part for part in url.path.split("/") if part]
+
+                if parts == ["search"]:
+                    offset = int(params.get("offset", 0))
+                    limit = int(params.get("limit", 10))
+                    return self._send_json(200, server.search(offset, limit))
+                if parts == ["complete"]:
+                    return self._send_json(200, server.complete(params.get("q", ""), int(params.get("limit", 10))))
+                if len(parts) in (2, 3) and parts[0] == "ad":
+                    ad = server.find_ad(parts[1])
+                    if ad is None:
+                        return self._send_json(404, {"message": "Ad not found"})
+                    if len(parts) == 2:
+                        return self._send_json(200, ad)
+                    if parts[2] == "logo":
+                        return self._send(200, LOGO_PNG, "image/png")
+                return self._send_json(404, {"message": "Not found"})
+
+            def _send_json(self, status: int, payload: Any):
+                self._send(status, json.dumps(payload).encode("utf-8"), "application/json")
+
+            def _send(self, status: int, body: bytes, content_type: str):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local stub of the JobTech API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--ads", type=int, default=10000, help="Number of synthetic ads")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--fixture", help="Recorded /search response or list of hits (JSON)")
+    args = parser.parse_args()
+
+    fake = FakeJobTechServer(host=args.host, port=args.port, ad_count=args.ads,
+                             latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                             error_rate=args.error_rate, fixture_path=args.fixture)
+    fake.start()
+    try:
+        fake._thread.join()
+    except KeyboardInterrupt:
+        fake.stop()
@@ -0,0 +1,422 @@
+"""
+Benchmark suite for the JobTech backend.
+
+Runs against a local FakeJobTechServer so results are reproducible:
+
+    python -m benchmarks.run_benchmarks --output bench_results.json
+    python -m benchmarks.run_benchmarks --suites micro --compare bench_results.json
+
+Suites:
+    micro   hit normalization, upsert batch, search payload serialization
+    load    concurrent requests against the app.py endpoints (throughput, p50/p95/p99)
+    ingest  scheduler update_jobs runs paging through 10k/100k/1M ads
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from benchmarks.fake_jobtech_server import FakeJobTechServer, synthetic_ad
+
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def summarize(samples_ms: List[float]) -> Dict[str, float]:
+    """Summary statistics for a list of latencies in milliseconds"""
+    ordered = sorted(samples_ms)
+    if not ordered:
+        return {}
+
+    def percentile(p: float) -> float:
+        index = min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))
+        return round(ordered[index], 3)
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "min_ms": round(ordered[0], 3),
+        "p50_ms": percentile(50),
+        "p95_ms": percentile(95),
+        "p99_ms": percentile(99),
+        "max_ms": round(ordered[-1], 3)
+    }
+
+def measure(func: Callable[[], Any], repeat: int, setup: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+    """
+    Time ``func`` ``repeat`` times, running ``setup`` untimed before each call.
+
+    A benchmark that raises is reported as ``{"error": ...}`` instead of timings.
+    """
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        try:
+            func()
+        except Exception as e:
+            logger.warning(f"Benchmark failed: {e.__class__.__name__}: {str(e)[:200]}")
+            return {"error": f"{e.__class__.__name__}: {str(e)[:200]}"}
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+def count_jobs() -> int:
+    from database import SessionLocal, Job
+    db = SessionLocal()
+    try:
+        return db.query(Job).count()
+    finally:
+        db.close()
+
+def clear_jobs() -> None:
+    """Delete every job; only ever run against the benchmark database"""
+    from database import SessionLocal, Job
+    db = SessionLocal()
+    try:
+        db.query(Job).delete()
+        db.commit()
+    finally:
+        db.close()
+
+def run_micro(args) -> Dict[str, Any]:
+    """Micro-benchmarks for the per-hit code paths"""
+    from database import SessionLocal, hit_to_job_data, upsert_jobs
+
+    hits = [synthetic_ad(i) for i in range(args.batch_size)]
+
+    def upsert():
+        db = SessionLocal()
+        try:
+            upsert_jobs(db, hits)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    payload = {"total": {"value": len(hits)}, "hits": hits}
+    encoded = json.dumps(payload)
+
+    results = {
+        "batch_size": args.batch_size,
+        "hit_normalization": measure(lambda: [hit_to_job_data(hit) for hit in hits], args.repeat),
+        "upsert_batch_insert": measure(upsert, args.repeat, setup=clear_jobs),
+        "upsert_batch_update": measure(upsert, args.repeat),
+        "serialize_search_response": measure(lambda: json.dumps(payload), args.repeat),
+        "deserialize_search_response": measure(lambda: json.loads(encoded), args.repeat)
+    }
+    for name in ("hit_normalization", "upsert_batch_insert", "upsert_batch_update"):
+        if "error" in results[name]:
+            continue
+        results[name]["per_hit_us"] = round(results[name]["mean_ms"] * 1000 / args.batch_size, 3)
+    clear_jobs()
+    return results
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_app(fake: FakeJobTechServer, database_url: str) -> Tuple[subprocess.Popen, str]:
+    """Start app.py under uvicorn in a subprocess pointed at the fake server"""
+    port = free_port()
+    env = dict(os.environ,
+               JOBTECH_BASE_URL=fake.base_url,
+               DATABASE_URL=database_url,
+               EMBEDDED_SCHEDULER="false")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=REPO_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"app.py exited with code {process.returncode}")
+        try:
+            requests.get(f"{base_url}/suggestions", timeout=1)
+            return process, base_url
+        except requests.exceptions.RequestException:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("app.py did not start within 30 seconds")
+
+def load_scenario(base_url: str, paths: List[str], concurrency: int) -> Dict[str, Any]:
+    """Issue every request in ``paths`` with ``concurrency`` threads"""
+    local = threading.local()
+
+    def call(path: str):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        start = time.perf_counter()
+        try:
+            status = local.session.get(f"{base_url}{path}", timeout=30).status_code
+        except requests.exceptions.RequestException:
+            status = None
+        return (time.perf_counter() - start) * 1000, status
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(call, paths))
+    elapsed = time.perf_counter() - start
+
+    ok = [latency for latency, status in results if status == 200]
+    failed = [latency for latency, status in results if status != 200]
+    # Percentiles cover successful responses only; fast 500s would flatter them
+    summary = summarize(ok)
+    summary.update({
+        "concurrency": concurrency,
+        "throughput_per_sec": round(len(ok) / elapsed, 2),
+        "error_rate": round(len(failed) / len(paths), 4),
+        "errors": summarize(failed)
+    })
+    return summary
+
+def run_load(args, database_url: str) -> Dict[str, Any]:
+    """Load scenarios against the app.py endpoints"""
+    fake = FakeJobTechServer(ad_count=args.ads, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                             error_rate=args.error_rate, fixture_path=args.fixture).start()
+    process, base_url = start_app(fake, database_url)
+    try:
+        n = args.requests
+        ad_ids = [fake.get_ad(i % fake.ad_count)["id"] for i in range(n)]
+        scenarios = {
+            "search": [f"/search?query=data%20engineer&offset={(i * 10) % fake.ad_count}&limit=10" for i in range(n)],
+            "job_cold": [f"/job/{ad_id}" for ad_id in ad_ids],
+            "job_warm": [f"/job/{ad_id}" for ad_id in ad_ids],
+            "job_logo": [f"/job/{ad_id}/logo" for ad_id in ad_ids],
+            "suggestions": ["/suggestions?query=da&limit=10" for _ in range(n)]
+        }
+        results = {}
+        for name, paths in scenarios.items():
+            if name == "job_cold":
+                clear_jobs()
+            results[name] = load_scenario(base_url, paths, args.concurrency)
+            logger.info(f"load/{name}: {results[name]}")
+            # Only upstream failures are injected; anything beyond that is a broken endpoint
+            if results[name]["error_rate"] > args.error_rate + args.max_error_excess:
+                results[name]["unhealthy"] = True
+                logger.error(f"load/{name}: error rate {results[name]['error_rate']:.2%} is above the injected "
+                             f"{args.error_rate:.2%} by more than {args.max_error_excess:.2%}")
+        return results
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+        fake.stop()
+
+def run_ingest(args) -> Dict[str, Any]:
+    """Scheduler ingest: page through the whole fake index with update_jobs"""
+    from jobtech_client import JobTechClient
+    from job_scheduler import update_jobs
+
+    results = {}
+    for size in args.ingest_sizes:
+        clear_jobs()
+        fake = FakeJobTechServer(ad_count=size, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms).start()
+        try:
+            client = JobTechClient(base_url=fake.base_url)
+            pages = []
+            start = time.perf_counter()
+            for offset in range(0, size, args.page_size):
+                page_start = time.perf_counter()
+                update_jobs(query="data engineer", limit=args.page_size, offset=offset, client=client)
+                pages.append((time.perf_counter() - page_start) * 1000)
+            elapsed = time.perf_counter() - start
+        except Exception as e:
+            results[str(size)] = {"error": f"{e.__class__.__name__}: {str(e)[:200]}"}
+            logger.warning(f"ingest/{size} failed: {results[str(size)]['error']}")
+            continue
+        finally:
+            fake.stop()
+
+        results[str(size)] = {
+            "ads": size,
+            "page_size": args.page_size,
+            "total_sec": round(elapsed, 3),
+            "ads_per_sec": round(size / elapsed, 2),
+            "page": summarize(pages)
+        }
+        logger.info(f"ingest/{size}: {results[str(size)]}")
+    clear_jobs()
+    return results
+
+def flatten(data: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in data.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, path))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[path] = value
+    return flat
+
+def find_errors(data: Dict[str, Any], prefix: str = "") -> Dict[str, str]:
+    """Paths of benchmarks that reported ``{"error": ...}`` instead of timings"""
+    found = {}
+    for key, value in data.items():
+        path = f"{prefix}.{key}" if prefix else key
+        if key == "error" and isinstance(value, str):
+            found[prefix] = value
+        elif isinstance(value, dict):
+            found.update(find_errors(value, path))
+    return found
+
+def is_compared(path: str) -> bool:
+    # Latencies of failed load requests are diagnostics; fewer of them is not a regression
+    return ".errors." not in path and path.endswith(("_ms", "_sec", "per_sec", "_us", "error_rate"))
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[str]:
+    """
+    Compare two result files.
+
+    Returns:
+        Metric paths that regressed by more than ``threshold`` percent, plus
+        baseline metrics that are missing or failed in the current run
+    """
+    old = {path: value for path, value in flatten(baseline.get("results", {})).items() if is_compared(path)}
+    new = {path: value for path, value in flatten(current.get("results", {})).items() if is_compared(path)}
+    errors = find_errors(current.get("results", {}))
+    regressions = []
+    print(f"{'metric':60} {'baseline':>12} {'current':>12} {'change':>9}")
+    for path in sorted(old):
+        if path not in new:
+            benchmark = next((name for name in errors if path.startswith(f"{name}.")), None)
+            print(f"{path:60} {old[path]:>12.3f} {'failed' if benchmark else 'missing':>12} {'':>9} !")
+            regressions.append(path)
+            continue
+        if path.endswith("error_rate"):
+            # Compare error rates in absolute points so a rise from zero is caught
+            change = (new[path] - old[path]) * 100
+            flag = " !" if change > 1 else ""
+            if flag:
+                regressions.append(path)
+            print(f"{path:60} {old[path]:>12.4f} {new[path]:>12.4f} {change:>+8.1f}pt{flag}")
+            continue
+        if not old[path]:
+            continue
+        change = (new[path] - old[path]) / old[path] * 100
+        # Throughput regresses when it drops, everything else when it grows
+        worse = -change if path.endswith("per_sec") else change
+        flag = " !" if worse > threshold else ""
+        if flag:
+            regressions.append(path)
+        print(f"{path:60} {old[path]:>12.3f} {new[path]:>12.3f} {change:>+8.1f}%{flag}")
+    return regressions
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the JobTech backend benchmark suite")
+    parser.add_argument("--suites", default="micro,load,ingest", help="Comma-separated suites to run")
+    parser.add_argument("--output", default="bench_results.json", help="Where to write JSON results")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Regression threshold in percent")
+    parser.add_argument("--database-url",
+                        help="Database for the run (default: a temporary SQLite file). "
+                             "The benchmarks DELETE ALL JOBS in it")
+    parser.add_argument("--allow-destructive", action="store_true",
+                        help="Allow --database-url to point at a database that already has jobs")
+    parser.add_argument("--repeat", type=int, default=20, help="Repetitions per micro-benchmark")
+    parser.add_argument("--batch-size", type=int, default=100, help="Hits per micro-benchmark batch")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per load scenario")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent clients per load scenario")
+    parser.add_argument("--ads", type=int, default=10000, help="Synthetic ads served in load scenarios")
+    parser.add_argument("--ingest-sizes", default="10000,100000,1000000", help="Comma-separated ingest sizes")
+    parser.add_argument("--page-size", type=int, default=100, help="Ads per update_jobs page during ingest")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Fake upstream latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Extra random upstream latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of upstream requests that fail (load only)")
+    parser.add_argument("--max-error-excess", type=float, default=0.05,
+                        help="Fail when a load scenario's error rate exceeds --error-rate by more than this")
+    parser.add_argument("--fixture", help="Recorded /search response or list of hits to serve in load scenarios")
+    args = parser.parse_args(argv)
+    args.suites = [suite.strip() for suite in args.suites.split(",") if suite.strip()]
+    args.ingest_sizes = [int(size) for size in args.ingest_sizes.split(",") if size.strip()]
+    return args
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    # Must be set before the repo modules create their engine and clients
+    tmpdir = tempfile.TemporaryDirectory()
+    try:
+        database_url = args.database_url or f"sqlite:///{os.path.join(tmpdir.name, 'bench.db')}"
+        os.environ["DATABASE_URL"] = database_url
+        from database import init_db
+        init_db()
+        if args.database_url and not args.allow_destructive and count_jobs() > 0:
+            print(f"{args.database_url} already has jobs and the benchmarks delete every row in it; "
+                  f"pass --allow-destructive to run anyway")
+            return 2
+        # Request/response logging from the client would dominate in-process timings
+        logging.getLogger().setLevel(logging.WARNING)
+        logger.setLevel(logging.INFO)
+
+        results = {}
+        if "micro" in args.suites:
+            results["micro"] = run_micro(args)
+        if "load" in args.suites:
+            results["load"] = run_load(args, database_url)
+        if "ingest" in args.suites:
+            results["ingest"] = run_ingest(args)
+    finally:
+        tmpdir.cleanup()
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": {key: value for key, value in vars(args).items() if key not in ("output", "compare")}
+        },
+        "results": results
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    logger.info(f"Results written to {args.output}")
+
+    status = 0
+    errors = find_errors(results)
+    for name, error in errors.items():
+        print(f"{name} failed: {error}")
+    if errors:
+        status = 1
+
+    unhealthy = [name for name, result in results.get("load", {}).items() if result.get("unhealthy")]
+    if unhealthy:
+        print(f"Load scenarios with unexpected errors: {', '.join(unhealthy)}")
+        status = 1
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} metrics regressed by more than {args.threshold}% or are missing/failed")
+            status = 1
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
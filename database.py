@@ -1,15 +1,18 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, JSON
+from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, JSON, Float
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from datetime import datetime
+from typing import Any, Callable, Dict, List, Tuple
 import logging
+import os
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
 # Create SQLite database
-SQLALCHEMY_DATABASE_URL = "sqlite:///./jobs.db"
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./jobs.db")
 
 # Create engine
 engine = create_engine(
@@ -49,6 +52,111 @@ class Job(Base):
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     last_updated = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+class SchedulerJobState(Base):
+    """One row per scheduled/triggered job, used as a lease so only one worker runs each slot"""
+    __tablename__ = "scheduler_job_state"
+
+    name = Column(String, primary_key=True)
+    next_run_at = Column(DateTime, nullable=False)
+    locked_by = Column(String, nullable=True)
+    locked_until = Column(DateTime, nullable=True)
+    last_started_at = Column(DateTime, nullable=True)
+    last_finished_at = Column(DateTime, nullable=True)
+    last_status = Column(String, nullable=True)
+    last_error = Column(Text, nullable=True)
+    last_duration_ms = Column(Float, nullable=True)
+
+class SchedulerRun(Base):
+    """Run history for the work queue"""
+    __tablename__ = "scheduler_runs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String, index=True)
+    worker_id = Column(String)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    duration_ms = Column(Float)
+    status = Column(String)
+    error = Column(Text, nullable=True)
+
+# Keep IN (...) lookups under SQLite's bound-parameter limit
+UPSERT_CHUNK_SIZE = 500
+
+def hit_to_job_data(hit: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a JobTech search hit or ad to Job column values"""
+    return {
+        "job_id": hit["id"],
+        "external_id": hit.get("external_id"),
+        "original_id": hit.get("original_id"),
+        "headline": hit.get("headline", ""),
+        "description": hit.get("description", {}).get("text", ""),
+        "webpage_url": hit.get("webpage_url", ""),
+        "logo_url": hit.get("logo_url"),
+        "application_deadline": datetime.fromisoformat(hit["application_deadline"]) if hit.get("application_deadline") else None,
+        "number_of_vacancies": hit.get("number_of_vacancies", 1),
+        "employer": hit.get("employer", {}),
+        "workplace_address": hit.get("workplace_address", {}),
+        "must_have": hit.get("must_have", {}),
+        "nice_to_have": hit.get("nice_to_have", {}),
+        "employment_type": hit.get("employment_type", {}).get("label", ""),
+        "salary_type": hit.get("salary_type", {}).get("label", ""),
+        "salary_description": hit.get("salary_description", ""),
+        "duration": hit.get("duration", {}).get("label", ""),
+        "working_hours_type": hit.get("working_hours_type", {}).get("label", ""),
+        "scope_of_work": hit.get("scope_of_work", 100)
+    }
+
+def upsert_jobs(db,
+                hits: List[Dict[str, Any]],
+                to_job_data: Callable[[Dict[str, Any]], Dict[str, Any]] = hit_to_job_data,
+                touch_column: str = "updated_at") -> Tuple[int, int]:
+    """
+    Insert new jobs and update existing ones from a batch of hits.
+
+    Each chunk is written with one ``INSERT ... ON CONFLICT(job_id) DO UPDATE``,
+    so overlapping writers (scheduled updates, refreshes, live searches) cannot
+    fail on the unique ``job_id``. Existing rows get the same ``to_job_data``
+    values as a new row plus ``touch_column`` set to now. The caller is
+    responsible for committing.
+
+    Args:
+        db: Database session
+        hits: JobTech search hits
+        to_job_data: Maps a hit to Job column values
+        touch_column: Timestamp column bumped on existing jobs
+
+    Returns:
+        Tuple of (new_count, updated_count), counted against the rows that
+        existed before the write
+    """
+    new_count = 0
+    updated_count = 0
+    for start in range(0, len(hits), UPSERT_CHUNK_SIZE):
+        # Later duplicates of an id within the chunk win, as they would row by row
+        by_id = {}
+        for hit in hits[start:start + UPSERT_CHUNK_SIZE]:
+            data = to_job_data(hit)
+            by_id[data["job_id"]] = data
+        chunk = list(by_id.values())
+        existing = {
+            job_id for (job_id,) in
+            db.query(Job.job_id).filter(Job.job_id.in_([data["job_id"] for data in chunk])).all()
+        }
+        # New rows would default the timestamp to now anyway; every row needs the same keys
+        now = datetime.utcnow()
+        rows = [dict(data, **{touch_column: now}) for data in chunk]
+
+        statement = sqlite_insert(Job)
+        statement = statement.on_conflict_do_update(
+            index_elements=[Job.job_id],
+            set_={column: statement.excluded[column] for column in rows[0] if column != "job_id"}
+        )
+        db.execute(statement, rows)
+
+        updated_count += len(existing)
+        new_count += len(chunk) - len(existing)
+    return new_count, updated_count
+
 # Create tables
 def init_db():
     logger.info("Initializing database...")
@@ -1,77 +1,79 @@
-from database import SessionLocal, Job, init_db
+from database import SessionLocal, Job, init_db, upsert_jobs
 from jobtech_client import JobTechClient
+from work_queue import WorkQueue
 from datetime import datetime, timedelta
+from typing import Optional, Dict
+import asyncio
 import logging
+import os
 import sys
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def update_jobs():
+# Work queue settings, overridable from the environment / .env
+UPDATE_INTERVAL_MINUTES = float(os.getenv("UPDATE_INTERVAL_MINUTES", "15"))
+CLEANUP_INTERVAL_HOURS = float(os.getenv("CLEANUP_INTERVAL_HOURS", "24"))
+SCHEDULER_CONCURRENCY = int(os.getenv("SCHEDULER_CONCURRENCY", "2"))
+REFRESH_MIN_INTERVAL_MINUTES = float(os.getenv("REFRESH_MIN_INTERVAL_MINUTES", "10"))
+
+def hit_to_scheduler_job_data(job_data: Dict) -> Dict:
+    """Job column values for a hit first seen by the scheduler"""
+    return {
+        "job_id": job_data['id'],
+        "headline": job_data.get('headline'),
+        "description": job_data.get('description', {}).get('text', ''),
+        "webpage_url": job_data.get('webpage_url'),
+        "logo_url": job_data.get('logo_url'),
+        "application_deadline": datetime.fromisoformat(job_data['application_deadline'].replace('Z', '+00:00')) if job_data.get('application_deadline') else None,
+        "number_of_vacancies": job_data.get('number_of_vacancies', 1),
+        "employer": job_data.get('employer', {}),
+        "workplace_address": job_data.get('workplace_address', {}),
+        "must_have": job_data.get('must_have', {}),
+        "nice_to_have": job_data.get('nice_to_have', {}),
+        "employment_type": job_data.get('employment_type', {}).get('label'),
+        "salary_type": job_data.get('salary_type', {}).get('label'),
+        "salary_description": job_data.get('salary_description'),
+        "duration": job_data.get('duration', {}).get('label'),
+        "working_hours_type": job_data.get('working_hours_type', {}).get('label'),
+        "scope_of_work": job_data.get('scope_of_work', {}),
+        "last_updated": datetime.utcnow()
+    }
+
+def update_jobs(query: str = "data engineer", limit: int = 50, offset: int = 0,
+                client: Optional[JobTechClient] = None) -> Dict[str, int]:
     """Search for new jobs and update existing ones"""
     db = SessionLocal()
-    client = JobTechClient()
+    # Reuse the caller's client when running in-process to skip its connection test
+    client = client or JobTechClient()
     
     try:
-        # Search for data engineer jobs
         search_params = {
-            "query": "data engineer",
-            "limit": 50
+            "query": query,
+            "offset": offset,
+            "limit": limit
         }
         
         response = client.search_jobs(**search_params)
         jobs_data = response.get('hits', [])
         
-        updated_count = 0
-        new_count = 0
-        
-        for job_data in jobs_data:
-            # Check if job already exists
-            existing_job = db.query(Job).filter(Job.job_id == job_data['id']).first()
-            
-            if existing_job:
-                # Update existing job
-                for key, value in job_data.items():
-                    if hasattr(existing_job, key):
-                        setattr(existing_job, key, value)
-                existing_job.last_updated = datetime.utcnow()
-                updated_count += 1
-            else:
-                # Create new job
-                new_job = Job(
-                    job_id=job_data['id'],
-                    headline=job_data.get('headline'),
-                    description=job_data.get('description', {}).get('text', ''),
-                    webpage_url=job_data.get('webpage_url'),
-                    logo_url=job_data.get('logo_url'),
-                    application_deadline=datetime.fromisoformat(job_data['application_deadline'].replace('Z', '+00:00')) if job_data.get('application_deadline') else None,
-                    number_of_vacancies=job_data.get('number_of_vacancies', 1),
-                    employer=job_data.get('employer', {}),
-                    workplace_address=job_data.get('workplace_address', {}),
-                    must_have=job_data.get('must_have', {}),
-                    nice_to_have=job_data.get('nice_to_have', {}),
-                    employment_type=job_data.get('employment_type', {}).get('label'),
-                    salary_type=job_data.get('salary_type', {}).get('label'),
-                    salary_description=job_data.get('salary_description'),
-                    duration=job_data.get('duration', {}).get('label'),
-                    working_hours_type=job_data.get('working_hours_type', {}).get('label'),
-                    scope_of_work=job_data.get('scope_of_work', {}),
-                    last_updated=datetime.utcnow()
-                )
-                db.add(new_job)
-                new_count += 1
+        new_count, updated_count = upsert_jobs(db, jobs_data,
+                                               to_job_data=hit_to_scheduler_job_data,
+                                               touch_column="last_updated")
         
         db.commit()
         logger.info(f"Job update completed: {new_count} new jobs added, {updated_count} jobs updated")
+        return {"new": new_count, "updated": updated_count}
         
     except Exception as e:
         logger.error(f"Error updating jobs: {str(e)}")
         db.rollback()
+        raise
     finally:
         db.close()
 
-def cleanup_old_jobs(days=7):
+def cleanup_old_jobs(days=7) -> int:
     """Remove jobs that haven't been updated in the specified number of days"""
     db = SessionLocal()
     try:
@@ -85,16 +87,37 @@ def cleanup_old_jobs(days=7):
         
         db.commit()
         logger.info(f"Cleanup completed: {count} old jobs removed")
+        return count
         
     except Exception as e:
         logger.error(f"Error cleaning up old jobs: {str(e)}")
         db.rollback()
+        raise
     finally:
         db.close()
 
+def create_work_queue(client: Optional[JobTechClient] = None) -> WorkQueue:
+    """Build the work queue with the periodic update and cleanup jobs registered"""
+    queue = WorkQueue(max_concurrency=SCHEDULER_CONCURRENCY)
+    queue.add_interval_job("update_jobs", update_jobs, UPDATE_INTERVAL_MINUTES * 60, client=client)
+    queue.add_interval_job("cleanup_old_jobs", cleanup_old_jobs, CLEANUP_INTERVAL_HOURS * 3600)
+    return queue
+
+async def trigger_refresh(queue: WorkQueue, query: str, client: Optional[JobTechClient] = None) -> str:
+    """Ask the work queue to refresh a search query in the background; returns the trigger status"""
+    # Fetch exactly the string the refresh is deduplicated on
+    query = query.strip().lower()
+    return await queue.trigger(
+        f"refresh:{query}",
+        update_jobs,
+        min_interval_seconds=REFRESH_MIN_INTERVAL_MINUTES * 60,
+        query=query,
+        client=client
+    )
+
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Usage: python3 job_scheduler.py [update|cleanup]")
+        print("Usage: python3 job_scheduler.py [update|cleanup|worker]")
         sys.exit(1)
     
     command = sys.argv[1]
@@ -102,5 +125,10 @@ if __name__ == "__main__":
         update_jobs()
     elif command == "cleanup":
         cleanup_old_jobs()
+    elif command == "worker":
+        # Standalone worker sharing the job state table with any embedded queues
+        init_db()
+        # One client for every run, so each update skips the client's connection test
+        asyncio.run(create_work_queue(client=JobTechClient()).run_forever())
     else:
-        print("Invalid command. Use 'update' or 'cleanup'") 
\ No newline at end of file
+        print("Invalid command. Use 'update', 'cleanup' or 'worker'") 
\ No newline at end of file
@@ -12,8 +12,9 @@ logger = logging.getLogger(__name__)
 load_dotenv()
 
 class JobTechClient:
-    def __init__(self):
-        self.base_url = "https://jobsearch.api.jobtechdev.se"  # Removed /v2 to test base URL first
+    def __init__(self, base_url: Optional[str] = None):
+        # JOBTECH_BASE_URL lets tests and benchmarks point at a local stub server
+        self.base_url = base_url or os.getenv("JOBTECH_BASE_URL", "https://jobsearch.api.jobtechdev.se")  # Removed /v2 to test base URL first
         self.headers = {
             "accept": "application/json"
         }
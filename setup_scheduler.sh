@@ -3,6 +3,9 @@
 # Get the absolute path of the script directory
 SCRIPT_DIR="$( cd "$( dirname "${BASH_SOURCE[0]}" )" && pwd )"
 
+# Cron fallback for hosts without a long-running API or worker process.
+# Prefer the embedded work queue or `python3 job_scheduler.py worker`.
+
 # Create the cron jobs
 # Run job updates daily at 8:00 AM
 (crontab -l 2>/dev/null; echo "0 8 * * * cd $SCRIPT_DIR && python3 job_scheduler.py update") | crontab -
@@ -1,5 +1,6 @@
-from database import SessionLocal, Job, init_db
+from database import SessionLocal, Job, init_db, upsert_jobs
 from datetime import datetime
+import threading
 
 def test_database():
     print("Initializing database...")
@@ -41,5 +42,87 @@ def test_database():
     finally:
         db.close()
 
+def test_upsert_jobs():
+    init_db()
+
+    hits = [
+        {"id": "TESTUPSERT001", "headline": "First", "description": {"text": "One"},
+         "application_deadline": "2026-01-31T23:59:59Z", "employment_type": {"label": "Heltid"}},
+        {"id": "TESTUPSERT002", "headline": "Second", "description": {"text": "Two"}}
+    ]
+    db = SessionLocal()
+    try:
+        db.query(Job).filter(Job.job_id.in_(["TESTUPSERT001", "TESTUPSERT002"])).delete(synchronize_session=False)
+        db.commit()
+
+        assert upsert_jobs(db, hits) == (2, 0)
+        db.commit()
+
+        job = db.query(Job).filter(Job.job_id == "TESTUPSERT001").first()
+        assert job.headline == "First"
+        assert job.description == "One"
+        assert job.employment_type == "Heltid"
+        assert job.application_deadline.year == 2026
+
+        hits[0]["headline"] = "First (updated)"
+        assert upsert_jobs(db, hits) == (0, 2)
+        db.commit()
+
+        job = db.query(Job).filter(Job.job_id == "TESTUPSERT001").first()
+        assert job.headline == "First (updated)"
+        assert job.description == "One"
+
+        db.query(Job).filter(Job.job_id.in_(["TESTUPSERT001", "TESTUPSERT002"])).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+def test_concurrent_upserts():
+    init_db()
+
+    job_ids = [f"TESTRACE{i:03d}" for i in range(50)]
+    hits = [{"id": job_id, "headline": f"Race {job_id}", "description": {"text": "Race"}} for job_id in job_ids]
+    errors = []
+
+    def clear():
+        db = SessionLocal()
+        try:
+            db.query(Job).filter(Job.job_id.in_(job_ids)).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+    def upsert(barrier):
+        db = SessionLocal()
+        try:
+            barrier.wait()
+            upsert_jobs(db, hits)
+            db.commit()
+        except Exception as e:
+            errors.append(e)
+            db.rollback()
+        finally:
+            db.close()
+
+    # Overlapping writers, e.g. update_jobs and a /search for the same ads
+    for _ in range(10):
+        clear()
+        barrier = threading.Barrier(2)
+        threads = [threading.Thread(target=upsert, args=(barrier,)) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    assert errors == []
+
+    db = SessionLocal()
+    try:
+        assert db.query(Job).filter(Job.job_id.in_(job_ids)).count() == 50
+    finally:
+        db.close()
+    clear()
+
 if __name__ == "__main__":
-    test_database() 
\ No newline at end of file
+    test_database()
+    test_upsert_jobs()
+    test_concurrent_upserts() 
\ No newline at end of file
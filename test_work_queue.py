@@ -0,0 +1,99 @@
+from work_queue import WorkQueue
+from database import init_db, SessionLocal, SchedulerJobState
+import asyncio
+import threading
+import uuid
+
+def test_interval_job_runs_once_across_workers():
+    print("Initializing database...")
+    init_db()
+
+    job_name = f"test_job_{uuid.uuid4().hex[:8]}"
+    runs = []
+
+    def record_run(worker):
+        runs.append(worker)
+
+    async def run_workers():
+        workers = [WorkQueue(poll_interval=0.05, worker_id=f"worker-{i}") for i in range(2)]
+        for worker in workers:
+            worker.add_interval_job(job_name, record_run, interval_seconds=3600, worker=worker.worker_id)
+            await worker.start()
+        await asyncio.sleep(0.5)
+        for worker in workers:
+            await worker.stop()
+        return workers[0].run_history(name=job_name)
+
+    print("Running two workers against the same job...")
+    history = asyncio.run(run_workers())
+    print(f"Runs: {runs}")
+    assert len(runs) == 1
+    assert len(history) == 1
+    assert history[0]["status"] == "success"
+    assert history[0]["duration_ms"] is not None
+
+def test_trigger_is_deduplicated():
+    init_db()
+
+    trigger_name = f"test_refresh_{uuid.uuid4().hex[:8]}"
+    runs = []
+
+    def refresh(query):
+        runs.append(query)
+
+    async def run_triggers():
+        worker = WorkQueue(poll_interval=0.05)
+        await worker.start()
+        first = await worker.trigger(trigger_name, refresh, min_interval_seconds=3600, query="data engineer")
+        second = await worker.trigger(trigger_name, refresh, min_interval_seconds=3600, query="data engineer")
+        await asyncio.sleep(0.3)
+        # Pending slot is cleared, but the run is inside the claim window
+        third = await worker.trigger(trigger_name, refresh, min_interval_seconds=3600, query="data engineer")
+        await asyncio.sleep(0.3)
+        await worker.stop()
+        return first, second, third
+
+    first, second, third = asyncio.run(run_triggers())
+    assert first == "queued"
+    assert second == "pending"
+    assert third == "deduplicated"
+    assert len(runs) == 1
+
+def test_stop_keeps_lease_of_running_job():
+    init_db()
+
+    job_name = f"test_shutdown_{uuid.uuid4().hex[:8]}"
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_job():
+        started.set()
+        release.wait(5)
+
+    async def run_and_stop():
+        worker = WorkQueue(poll_interval=0.05, worker_id="worker-shutdown")
+        worker.add_interval_job(job_name, slow_job, interval_seconds=3600)
+        await worker.start()
+        await asyncio.to_thread(started.wait, 5)
+        await worker.stop()
+        history = worker.run_history(name=job_name)
+        # Let the job thread finish so the loop's executor can shut down
+        release.set()
+        return history
+
+    history = asyncio.run(run_and_stop())
+    assert history[0]["status"] == "cancelled"
+
+    db = SessionLocal()
+    try:
+        state = db.query(SchedulerJobState).filter(SchedulerJobState.name == job_name).first()
+        assert state.locked_by == "worker-shutdown"
+        assert state.locked_until is not None
+        assert state.last_status == "cancelled"
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    test_interval_job_runs_once_across_workers()
+    test_trigger_is_deduplicated()
+    test_stop_keeps_lease_of_running_job()
@@ -0,0 +1,301 @@
+import asyncio
+import logging
+import os
+import signal
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import desc, or_
+from sqlalchemy.exc import IntegrityError
+
+from database import SessionLocal, SchedulerJobState, SchedulerRun, init_db
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class WorkQueue:
+    """
+    In-process asyncio scheduler and work queue.
+
+    Interval jobs and on-demand triggers are pushed onto a single queue and
+    consumed by ``max_concurrency`` workers. Before running, every item claims
+    its row in ``scheduler_job_state``; the claim advances ``next_run_at``, so
+    each slot runs at most once even when several processes share the database.
+    Blocking job functions run in worker threads so the event loop stays free.
+    """
+
+    def __init__(self,
+                 max_concurrency: int = 2,
+                 poll_interval: float = 5.0,
+                 lease_seconds: int = 600,
+                 worker_id: Optional[str] = None):
+        self.max_concurrency = max_concurrency
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self._interval_jobs: Dict[str, Dict[str, Any]] = {}
+        self._next_check: Dict[str, float] = {}
+        self._pending: Set[str] = set()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._stopped: Optional[asyncio.Event] = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def add_interval_job(self, name: str, func: Callable[..., Any], interval_seconds: float, **kwargs) -> None:
+        """
+        Register a job that runs every ``interval_seconds``.
+
+        Args:
+            name: Unique job name, also the key in the job state table
+            func: Blocking callable to run in a worker thread
+            interval_seconds: Seconds between runs
+            **kwargs: Keyword arguments passed to ``func``
+        """
+        self._interval_jobs[name] = {
+            "name": name,
+            "func": func,
+            "interval": interval_seconds,
+            "kwargs": kwargs
+        }
+        self._next_check[name] = 0.0
+
+    async def trigger(self, name: str, func: Callable[..., Any], min_interval_seconds: float = 0, **kwargs) -> str:
+        """
+        Enqueue an on-demand run of ``func``.
+
+        Triggers with the same name are deduplicated while queued, and across
+        workers a name runs at most once per ``min_interval_seconds``.
+
+        Returns:
+            "queued" if the run was enqueued, "pending" if the same trigger is
+            already queued, "deduplicated" if it ran within
+            ``min_interval_seconds`` or is running elsewhere, or "not_running"
+            if the queue has not been started
+        """
+        if self._queue is None:
+            return "not_running"
+        if name in self._pending:
+            return "pending"
+        # Reserve the name before awaiting so concurrent triggers see it as pending
+        self._pending.add(name)
+        try:
+            claimable = await asyncio.to_thread(self._is_claimable, name)
+        except Exception:
+            self._pending.discard(name)
+            raise
+        if not claimable:
+            self._pending.discard(name)
+            return "deduplicated"
+        if self._queue is None:
+            # Stopped while the state check was running
+            self._pending.discard(name)
+            return "not_running"
+        self._queue.put_nowait({
+            "name": name,
+            "func": func,
+            "interval": min_interval_seconds,
+            "kwargs": kwargs
+        })
+        logger.info(f"Triggered on-demand job: {name}")
+        return "queued"
+
+    async def start(self) -> None:
+        """Start the ticker and consumer tasks on the running event loop"""
+        if self.running:
+            return
+        await asyncio.to_thread(init_db)
+        self._queue = asyncio.Queue()
+        self._stopped = asyncio.Event()
+        self._tasks.append(asyncio.create_task(self._ticker()))
+        for _ in range(self.max_concurrency):
+            self._tasks.append(asyncio.create_task(self._consumer()))
+        logger.info(f"Work queue {self.worker_id} started with {len(self._interval_jobs)} interval jobs, "
+                    f"concurrency {self.max_concurrency}")
+
+    async def stop(self) -> None:
+        """
+        Cancel all tasks.
+
+        A job cut off mid-run may still be executing in its worker thread, so
+        its lease is kept until ``lease_seconds`` expires rather than released.
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        self._pending.clear()
+        if self._stopped is not None:
+            self._stopped.set()
+        logger.info(f"Work queue {self.worker_id} stopped")
+
+    async def run_forever(self) -> None:
+        """Standalone worker mode: run until SIGINT/SIGTERM"""
+        await self.start()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, lambda: asyncio.ensure_future(self.stop()))
+            except NotImplementedError:
+                pass
+        await self._stopped.wait()
+
+    def run_history(self, name: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        """Return the most recent runs, newest first"""
+        db = SessionLocal()
+        try:
+            query = db.query(SchedulerRun)
+            if name:
+                query = query.filter(SchedulerRun.name == name)
+            runs = query.order_by(desc(SchedulerRun.started_at)).limit(limit).all()
+            return [{
+                "name": run.name,
+                "worker_id": run.worker_id,
+                "started_at": run.started_at,
+                "finished_at": run.finished_at,
+                "duration_ms": run.duration_ms,
+                "status": run.status,
+                "error": run.error
+            } for run in runs]
+        finally:
+            db.close()
+
+    async def _ticker(self) -> None:
+        while True:
+            now = time.monotonic()
+            for name, job in self._interval_jobs.items():
+                if name in self._pending or self._next_check[name] > now:
+                    continue
+                self._pending.add(name)
+                self._queue.put_nowait(job)
+            await asyncio.sleep(self.poll_interval)
+
+    async def _consumer(self) -> None:
+        while True:
+            item = await self._queue.get()
+            try:
+                await self._run(item)
+            except Exception as e:
+                logger.error(f"Error running job {item['name']}: {str(e)}")
+            finally:
+                self._pending.discard(item["name"])
+                self._queue.task_done()
+
+    async def _run(self, item: Dict[str, Any]) -> None:
+        name = item["name"]
+        claimed, next_run_at = await asyncio.to_thread(self._claim, name, item["interval"])
+        if name in self._interval_jobs:
+            # Check again when the slot is next due, whichever worker ran it
+            delay = (next_run_at - datetime.utcnow()).total_seconds()
+            self._next_check[name] = time.monotonic() + max(delay, 0)
+        if not claimed:
+            logger.debug(f"Skipping {name}: already claimed or not due")
+            return
+
+        started_at = datetime.utcnow()
+        start = time.perf_counter()
+        status, error = "success", None
+        try:
+            await asyncio.to_thread(item["func"], **item["kwargs"])
+        except asyncio.CancelledError:
+            status = "cancelled"
+            raise
+        except Exception as e:
+            status, error = "failed", str(e)
+            logger.error(f"Job {name} failed: {error}")
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            await asyncio.to_thread(self._finish, name, started_at, duration_ms, status, error)
+        logger.info(f"Job {name} finished: {status} in {duration_ms:.1f} ms")
+
+    def _is_claimable(self, name: str) -> bool:
+        """Whether ``_claim`` would currently succeed for ``name``; the claim itself stays authoritative"""
+        now = datetime.utcnow()
+        db = SessionLocal()
+        try:
+            state = db.query(SchedulerJobState).filter(SchedulerJobState.name == name).first()
+            if state is None:
+                return True
+            return state.next_run_at <= now and (state.locked_until is None or state.locked_until < now)
+        finally:
+            db.close()
+
+    def _claim(self, name: str, interval_seconds: float):
+        """
+        Atomically take the lease on ``name`` if it is due and not locked.
+
+        Returns:
+            Tuple of (claimed, next_run_at)
+        """
+        now = datetime.utcnow()
+        db = SessionLocal()
+        try:
+            if db.query(SchedulerJobState).filter(SchedulerJobState.name == name).first() is None:
+                db.add(SchedulerJobState(name=name, next_run_at=now))
+                try:
+                    db.commit()
+                except IntegrityError:
+                    # Another worker created the row first
+                    db.rollback()
+
+            claimed = db.query(SchedulerJobState).filter(
+                SchedulerJobState.name == name,
+                SchedulerJobState.next_run_at <= now,
+                or_(SchedulerJobState.locked_until.is_(None), SchedulerJobState.locked_until < now)
+            ).update({
+                SchedulerJobState.next_run_at: now + timedelta(seconds=interval_seconds),
+                SchedulerJobState.locked_by: self.worker_id,
+                SchedulerJobState.locked_until: now + timedelta(seconds=self.lease_seconds),
+                SchedulerJobState.last_started_at: now
+            }, synchronize_session=False)
+            db.commit()
+
+            state = db.query(SchedulerJobState).filter(SchedulerJobState.name == name).first()
+            return claimed == 1, state.next_run_at
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _finish(self, name: str, started_at: datetime, duration_ms: float, status: str, error: Optional[str]) -> None:
+        """Record the run and release the lease, unless the run was cancelled"""
+        finished_at = datetime.utcnow()
+        values = {
+            SchedulerJobState.last_finished_at: finished_at,
+            SchedulerJobState.last_status: status,
+            SchedulerJobState.last_error: error,
+            SchedulerJobState.last_duration_ms: duration_ms
+        }
+        if status != "cancelled":
+            # A cancelled job's thread may still be running; let the lease expire instead
+            values[SchedulerJobState.locked_by] = None
+            values[SchedulerJobState.locked_until] = None
+        db = SessionLocal()
+        try:
+            db.query(SchedulerJobState).filter(
+                SchedulerJobState.name == name,
+                SchedulerJobState.locked_by == self.worker_id
+            ).update(values, synchronize_session=False)
+            db.add(SchedulerRun(
+                name=name,
+                worker_id=self.worker_id,
+                started_at=started_at,
+                finished_at=finished_at,
+                duration_ms=duration_ms,
+                status=status,
+                error=error
+            ))
+            db.commit()
+        except Exception as e:
+            logger.error(f"Error recording run for {name}: {str(e)}")
+            db.rollback()
+        finally:
+            db.close()